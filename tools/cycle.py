@@ -14,12 +14,13 @@ Usage:
     python3 cycle.py history                 # recent cycles with lengths
 """
 
-import argparse
-import math
+import re
 import sqlite3
 import sys
 from datetime import datetime, date, timedelta
+from operator import itemgetter
 from pathlib import Path
+from typing import NamedTuple
 
 DB_PATH = Path.home() / ".recall" / "recall.db"
 
@@ -30,26 +31,113 @@ PHASES = [
     (99, "Luteal"),
 ]
 
+# Phase name by cycle day, built from PHASES; later days clamp to the last entry
+_PHASE_LUT = tuple(
+    next(name for threshold, name in PHASES if day <= threshold)
+    for day in range(PHASES[-1][0] + 1)
+)
+
+# Exponential weights for the cycle length estimate, indexed by cycle age
+# (0 = most recent). Decay factor 0.7 means each older cycle gets 70% of
+# the next one's weight. _WEIGHT_SUMS[m] is the total for the last m cycles.
+PREDICT_CYCLES = 8
+_DECAY = 0.7
+_WEIGHTS = tuple(_DECAY ** age for age in range(PREDICT_CYCLES))
+_WEIGHT_SUMS = tuple(sum(reversed(_WEIGHTS[:m])) for m in range(PREDICT_CYCLES + 1))
+
 
 # ── Database ──────────────────────────────────────────────────
 
-def ensure_table(conn: sqlite3.Connection):
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS cycle_starts (
-            date TEXT PRIMARY KEY,
-            notes TEXT,
-            created_at TEXT NOT NULL
-        )
+def open_db() -> sqlite3.Connection:
+    """Open recall.db with the same WAL setup the server uses."""
+    conn = sqlite3.connect(str(DB_PATH))
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
     """)
-    conn.commit()
+    return conn
+
+
+# Single-column SELECTs: take the value straight off each cursor row
+_first = itemgetter(0)
+
+
+# Proleptic Gregorian ordinal (date.toordinal()) derived from the ISO date.
+# The date column stays TEXT: fitbit-cron.sh copies rows between hosts as
+# (date, notes, created_at), so ord is generated rather than written.
+ORD_COLUMN = "ord INTEGER GENERATED ALWAYS AS (CAST(julianday(date) - 1721424.5 AS INTEGER)) VIRTUAL"
+
+
+def ensure_table(conn: sqlite3.Connection):
+    """Create or migrate cycle_starts; a single lookup once it is current."""
+    # idx_cycle_ord_notes is created last, so its presence means the schema is done
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_cycle_ord_notes'"
+    ).fetchone():
+        return
+
+    columns = {r[1] for r in conn.execute("PRAGMA table_xinfo(cycle_starts)")}
+    if not columns:
+        script = f"""
+            CREATE TABLE cycle_starts (
+                date TEXT PRIMARY KEY,
+                notes TEXT,
+                created_at TEXT NOT NULL,
+                {ORD_COLUMN}
+            );
+        """
+    elif "ord" not in columns:
+        script = f"ALTER TABLE cycle_starts ADD COLUMN {ORD_COLUMN};"
+    else:
+        script = ""
+    # Covering index: the latest-start lookup reads ord and notes without
+    # touching the table B-tree. It supersedes the earlier ord-only index.
+    script += """
+        DROP INDEX IF EXISTS idx_cycle_ord;
+        CREATE INDEX IF NOT EXISTS idx_cycle_ord_notes ON cycle_starts(ord, notes);
+    """
+    conn.executescript(script)
 
 
 def get_starts(conn: sqlite3.Connection) -> list[date]:
     """Return all period start dates, sorted ascending."""
-    rows = conn.execute(
-        "SELECT date FROM cycle_starts ORDER BY date ASC"
-    ).fetchall()
-    return [date.fromisoformat(r[0]) for r in rows]
+    cursor = conn.execute("SELECT ord FROM cycle_starts ORDER BY ord ASC")
+    return list(map(date.fromordinal, map(_first, cursor)))
+
+
+def get_recent_ordinals(conn: sqlite3.Connection, limit: int = 11) -> list[int]:
+    """Return the most recent `limit` period starts as ordinals, sorted ascending."""
+    cursor = conn.execute("SELECT ord FROM cycle_starts ORDER BY ord DESC LIMIT ?", (limit,))
+    ords = list(map(_first, cursor))
+    ords.reverse()
+    return ords
+
+
+def get_span(conn: sqlite3.Connection) -> tuple[int, int, int]:
+    """Return (first_ord, last_ord, count) over all period starts.
+
+    The mean of all cycle lengths is (last_ord - first_ord) / (count - 1),
+    since consecutive differences telescope.
+    """
+    first, last, count = conn.execute(
+        "SELECT MIN(ord), MAX(ord), COUNT(*) FROM cycle_starts"
+    ).fetchone()
+    return first, last, count
+
+
+def get_last_start_on_or_before(
+    conn: sqlite3.Connection, for_date: date
+) -> tuple[date, str | None] | None:
+    """Return (start_date, notes) of the latest period start <= for_date."""
+    row = conn.execute(
+        "SELECT ord, notes FROM cycle_starts WHERE ord <= ? ORDER BY ord DESC LIMIT 1",
+        (for_date.toordinal(),),
+    ).fetchone()
+    if row is None:
+        return None
+    return date.fromordinal(row[0]), row[1]
 
 
 def get_cycle_lengths(starts: list[date]) -> list[tuple[date, int]]:
@@ -61,161 +149,181 @@ def get_cycle_lengths(starts: list[date]) -> list[tuple[date, int]]:
     return lengths
 
 
+def ordinal_lengths(ords: list[int]) -> list[int]:
+    """Cycle lengths in days from ascending start ordinals (plain int diffs)."""
+    return [b - a for a, b in zip(ords, ords[1:])]
+
+
 # ── Import ────────────────────────────────────────────────────
 
+# One ".mesicky" line: "dd. mm. yyyy"
+_MESICKY_RE = re.compile(rb"(\d{1,2})\.\s*(\d{1,2})\.\s*(\d{4})$")
+
+
 def import_mesicky(conn: sqlite3.Connection, path: str):
     """Import period starts from .mesicky flat file (dd. mm. yyyy format)."""
     ensure_table(conn)
     now = datetime.now().isoformat()
-    count = 0
-
-    with open(path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            parts = line.split(". ")
-            if len(parts) != 3:
-                print(f"  Skipping malformed line: {line!r}")
-                continue
-            try:
-                day, month, year = int(parts[0]), int(parts[1]), int(parts[2])
-                d = date(year, month, day)
-            except (ValueError, IndexError):
-                print(f"  Skipping invalid date: {line!r}")
-                continue
-
-            conn.execute(
-                "INSERT OR IGNORE INTO cycle_starts (date, notes, created_at) VALUES (?, ?, ?)",
-                (d.isoformat(), None, now),
-            )
-            count += 1
-
-    conn.commit()
-    print(f"Imported {count} entries from {path}")
+    rows = []
+    skipped = []
+
+    # One read and a bytes regex: no per-line decode or readline bookkeeping
+    with open(path, "rb") as f:
+        data = f.read()
+
+    for line in data.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        m = _MESICKY_RE.match(line)
+        if not m:
+            skipped.append(("malformed line", line))
+            continue
+        try:
+            d = date(int(m[3]), int(m[2]), int(m[1]))
+        except ValueError:
+            skipped.append(("invalid date", line))
+            continue
+
+        rows.append((d.isoformat(), None, now))
+
+    for reason, line in skipped:
+        print(f"  Skipping {reason}: {line.decode(errors='replace')!r}")
+
+    # One transaction and one prepared statement for the whole file
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO cycle_starts (date, notes, created_at) VALUES (?, ?, ?)",
+            rows,
+        )
+    print(f"Imported {len(rows)} entries from {path}")
 
 
 # ── Add ───────────────────────────────────────────────────────
 
-def add_start(conn: sqlite3.Connection, date_str: str, notes: str | None = None):
-    """Record a new period start date."""
+def add_start(
+    conn: sqlite3.Connection,
+    date_str: str,
+    notes: str | None = None,
+    commit: bool = True,
+    created_at: str | None = None,
+):
+    """Record a new period start date.
+
+    Pass commit=False to batch several inserts into the caller's transaction,
+    and a shared created_at timestamp to skip formatting one per row.
+    """
     ensure_table(conn)
     d = date.fromisoformat(date_str)
-    now = datetime.now().isoformat()
+    if created_at is None:
+        created_at = datetime.now().isoformat()
     conn.execute(
         "INSERT OR REPLACE INTO cycle_starts (date, notes, created_at) VALUES (?, ?, ?)",
-        (d.isoformat(), notes, now),
+        (d.isoformat(), notes, created_at),
     )
-    conn.commit()
+    if commit:
+        conn.commit()
     print(f"Recorded period start: {d.isoformat()}" + (f" ({notes})" if notes else ""))
 
 
 # ── Prediction ────────────────────────────────────────────────
 
-def predict_cycle_length(starts: list[date], n_recent: int = 8) -> float | None:
-    """Exponentially weighted average of recent cycle lengths.
-
-    More recent cycles get higher weight. Uses last n_recent completed cycles.
+def analyze_recent(
+    lengths: list[int],
+    n_trend: int = 10,
+    n_range: int = 5,
+) -> tuple[float | None, str, tuple[int, int] | None]:
+    """Length estimate, trend, and recent range in one pass over recent cycles.
+
+    The estimate is an exponentially weighted average of the last
+    PREDICT_CYCLES completed cycles (see _WEIGHTS). The trend is
+    the least-squares slope over the last n_trend cycles. The range is
+    (min, max) over the last n_range cycles.
     """
-    lengths = get_cycle_lengths(starts)
     if not lengths:
-        return None
+        return None, "insufficient data", None
 
-    recent = lengths[-n_recent:]
+    window = max(PREDICT_CYCLES, n_trend, n_range)
+    recent = lengths[-window:]
     n = len(recent)
 
-    # Exponential weights: most recent gets highest weight
-    # decay factor 0.7 means each older cycle gets 70% of the next one's weight
-    decay = 0.7
-    weights = [decay ** (n - 1 - i) for i in range(n)]
-    total_weight = sum(weights)
-
-    weighted_sum = sum(w * length for w, (_, length) in zip(weights, recent))
-    return weighted_sum / total_weight
-
-
-def detect_trend(starts: list[date], n_recent: int = 10) -> str:
-    """Detect if cycles are shortening, lengthening, or stable."""
-    lengths = get_cycle_lengths(starts)
-    if len(lengths) < 4:
-        return "insufficient data"
-
-    recent = [l for _, l in lengths[-n_recent:]]
-    n = len(recent)
+    weighted_sum = 0.0
+    trend_sum = trend_xy = 0.0
+    lo = hi = None
+    trend_start = max(n - n_trend, 0)
+    for i, length in enumerate(recent):
+        age = n - 1 - i  # 0 = most recent
+        if age < PREDICT_CYCLES:
+            weighted_sum += _WEIGHTS[age] * length
+        if i >= trend_start:
+            trend_sum += length
+            trend_xy += (i - trend_start) * length
+        if age < n_range:
+            lo = length if lo is None or length < lo else lo
+            hi = length if hi is None or length > hi else hi
+
+    est_length = weighted_sum / _WEIGHT_SUMS[min(n, PREDICT_CYCLES)]
 
     # Simple linear regression: slope of cycle length over time
-    x_mean = (n - 1) / 2.0
-    y_mean = sum(recent) / n
-    numerator = sum((i - x_mean) * (y - y_mean) for i, y in enumerate(recent))
-    denominator = sum((i - x_mean) ** 2 for i in range(n))
-
-    if denominator == 0:
-        return "stable"
-
-    slope = numerator / denominator
+    m = n - trend_start
+    if len(lengths) < 4:
+        trend = "insufficient data"
+    else:
+        x_mean = (m - 1) / 2.0
+        denominator = m * (m * m - 1) / 12.0  # sum of (x - x_mean)^2
+        slope = (trend_xy - x_mean * trend_sum) / denominator
+        if slope > 0.3:
+            trend = "lengthening"
+        elif slope < -0.3:
+            trend = "shortening"
+        else:
+            trend = "stable"
 
-    if slope > 0.3:
-        return "lengthening"
-    elif slope < -0.3:
-        return "shortening"
-    return "stable"
+    return est_length, trend, (lo, hi)
 
 
 # ── Cycle Info ────────────────────────────────────────────────
 
 def get_phase(cycle_day: int) -> str:
     """Map cycle day to phase name."""
-    for threshold, name in PHASES:
-        if cycle_day <= threshold:
-            return name
-    return "Luteal"
+    return _PHASE_LUT[min(cycle_day, len(_PHASE_LUT) - 1)]
 
 
-def get_cycle_info(conn: sqlite3.Connection, for_date: date | None = None) -> dict | None:
-    """Get cycle context for a given date.
+class CycleInfo(NamedTuple):
+    """Cycle context for one date, as returned by get_cycle_info."""
+    cycle_day: int
+    phase: str
+    cycle_length_estimate: float
+    predicted_next: str
+    trend: str
+    recent_range: tuple[int, int] | None
+    anomaly: str | None
+    note: str | None
 
-    Returns dict with: cycle_day, phase, cycle_length_estimate,
-    predicted_next, trend, recent_range, note
-    """
+
+def get_cycle_info(conn: sqlite3.Connection, for_date: date | None = None) -> CycleInfo | None:
+    """Get cycle context for a given date, or None before the first start."""
     ensure_table(conn)
-    starts = get_starts(conn)
-    if not starts:
-        return None
 
     if for_date is None:
         for_date = date.today()
 
-    # Find the most recent period start on or before for_date
-    last_start = None
-    for s in reversed(starts):
-        if s <= for_date:
-            last_start = s
-            break
-
-    if last_start is None:
+    last = get_last_start_on_or_before(conn, for_date)
+    if last is None:
         return None
+    last_start, note = last
+
+    # Enough history for the 10-cycle trend window
+    lengths = ordinal_lengths(get_recent_ordinals(conn))
 
     cycle_day = (for_date - last_start).days + 1  # day 1 = first day of period
 
-    est_length = predict_cycle_length(starts)
+    est_length, trend, recent_range = analyze_recent(lengths)
     if est_length is None:
         est_length = 28.0  # fallback
 
     predicted_next = last_start + timedelta(days=round(est_length))
 
-    # Recent cycle length range
-    lengths = get_cycle_lengths(starts)
-    recent_lengths = [l for _, l in lengths[-5:]]
-    recent_range = (min(recent_lengths), max(recent_lengths)) if recent_lengths else None
-
-    trend = detect_trend(starts)
-
-    # Check for note on this cycle's start
-    row = conn.execute(
-        "SELECT notes FROM cycle_starts WHERE date = ?", (last_start.isoformat(),)
-    ).fetchone()
-    note = row[0] if row and row[0] else None
-
     # Flag if current cycle is running long
     anomaly = None
     if cycle_day > est_length + 5:
@@ -223,16 +331,16 @@ def get_cycle_info(conn: sqlite3.Connection, for_date: date | None = None) -> di
     elif recent_range and est_length < recent_range[0] - 3:
         anomaly = f"recent cycles shorter than usual"
 
-    return {
-        "cycle_day": cycle_day,
-        "phase": get_phase(cycle_day),
-        "cycle_length_estimate": round(est_length, 1),
-        "predicted_next": predicted_next.isoformat(),
-        "trend": trend,
-        "recent_range": recent_range,
-        "anomaly": anomaly,
-        "note": note,
-    }
+    return CycleInfo(
+        cycle_day=cycle_day,
+        phase=get_phase(cycle_day),
+        cycle_length_estimate=round(est_length, 1),
+        predicted_next=predicted_next.isoformat(),
+        trend=trend,
+        recent_range=recent_range,
+        anomaly=anomaly,
+        note=note or None,
+    )
 
 
 # ── Summary for fitbit-sync ──────────────────────────────────
@@ -240,23 +348,23 @@ def get_cycle_info(conn: sqlite3.Connection, for_date: date | None = None) -> di
 def build_cycle_summary(conn: sqlite3.Connection, for_date: date | None = None) -> str | None:
     """Build cycle summary text block for health summary integration."""
     info = get_cycle_info(conn, for_date)
-    if not info:
+    if info is None:
         return None
 
     lines = ["Cycle:"]
-    est = info["cycle_length_estimate"]
-    lines.append(f"- Day {info['cycle_day']} of ~{est:.0f} ({info['phase']} phase)")
-    lines.append(f"- Predicted next: {info['predicted_next']}")
+    est = info.cycle_length_estimate
+    lines.append(f"- Day {info.cycle_day} of ~{est:.0f} ({info.phase} phase)")
+    lines.append(f"- Predicted next: {info.predicted_next}")
 
-    if info["recent_range"]:
-        lo, hi = info["recent_range"]
-        lines.append(f"- Recent trend: {info['trend']} (last 5 range {lo}-{hi})")
+    if info.recent_range:
+        lo, hi = info.recent_range
+        lines.append(f"- Recent trend: {info.trend} (last 5 range {lo}-{hi})")
 
-    if info["anomaly"]:
-        lines.append(f"- Note: {info['anomaly']}")
+    if info.anomaly:
+        lines.append(f"- Note: {info.anomaly}")
 
-    if info["note"]:
-        lines.append(f"- Cycle note: {info['note']}")
+    if info.note:
+        lines.append(f"- Cycle note: {info.note}")
 
     return "\n".join(lines)
 
@@ -264,7 +372,7 @@ def build_cycle_summary(conn: sqlite3.Connection, for_date: date | None = None)
 # ── CLI ───────────────────────────────────────────────────────
 
 def cmd_import(args):
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = open_db()
     import_mesicky(conn, args.path)
     starts = get_starts(conn)
     lengths = get_cycle_lengths(starts)
@@ -273,23 +381,23 @@ def cmd_import(args):
 
 
 def cmd_add(args):
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = open_db()
     add_start(conn, args.date, args.note)
     conn.close()
 
 
 def cmd_today(args):
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = open_db()
     add_start(conn, date.today().isoformat(), args.note)
     conn.close()
 
 
 def cmd_status(args):
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = open_db()
     ensure_table(conn)
 
     info = get_cycle_info(conn)
-    if not info:
+    if info is None:
         print("No cycle data found. Import with: cycle.py import ~/.mesicky")
         conn.close()
         return
@@ -299,51 +407,54 @@ def cmd_status(args):
     print()
 
     # Extra detail for CLI — recent cycles only
-    starts = get_starts(conn)
-    lengths = get_cycle_lengths(starts)
-    if lengths:
-        recent = [l for _, l in lengths[-10:]]
+    recent = ordinal_lengths(get_recent_ordinals(conn))
+    if recent:
+        _, _, count = get_span(conn)
         print(f"Recent 10 avg: {sum(recent)/len(recent):.1f} days (range {min(recent)}-{max(recent)})")
-        print(f"Total tracked: {len(lengths)} cycles")
+        print(f"Total tracked: {count - 1} cycles")
 
     conn.close()
 
 
 def cmd_history(args):
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = open_db()
     ensure_table(conn)
-    starts = get_starts(conn)
-    lengths = get_cycle_lengths(starts)
 
+    # Only the tail is printed: N cycles need N + 1 starts
     n = args.count or 20
-    recent = lengths[-n:]
+    ords = get_recent_ordinals(conn, n + 1)
+    recent = ordinal_lengths(ords)
 
     if not recent:
         print("No completed cycles found.")
         conn.close()
         return
 
-    all_lens = [l for _, l in lengths]
-    avg = sum(all_lens) / len(all_lens)
+    first, last, count = get_span(conn)
+    avg = (last - first) / (count - 1)
 
     print(f"Last {len(recent)} cycles (avg {avg:.1f} days):\n")
-    for start, length in recent:
+    for start, length in zip(ords, recent):
         marker = ""
         if length < avg - 4:
             marker = " << short"
         elif length > avg + 4:
             marker = " >> long"
-        print(f"  {start.isoformat()}  {length:2d} days{marker}")
+        print(f"  {date.fromordinal(start).isoformat()}  {length:2d} days{marker}")
 
     # Current incomplete cycle
-    if starts:
-        current_day = (date.today() - starts[-1]).days + 1
-        print(f"\n  {starts[-1].isoformat()}  day {current_day} (current)")
+    current = date.fromordinal(ords[-1])
+    current_day = (date.today() - current).days + 1
+    print(f"\n  {current.isoformat()}  day {current_day} (current)")
 
     conn.close()
 
 
 def main():
+    # Imported here so fitbit-sync.py, which only needs build_cycle_summary,
+    # doesn't pay for it
+    import argparse
+
     parser = argparse.ArgumentParser(description="Menstrual cycle tracking for Recall")
     sub = parser.add_subparsers(dest="command")
 
@@ -9,29 +9,41 @@ and writes to the shared recall.db SQLite database.
 Usage:
     python3 fitbit-sync.py auth           # One-time OAuth2 setup
     python3 fitbit-sync.py sync           # Sync today + yesterday
-    python3 fitbit-sync.py sync --days 30 # Backfill last 30 days
+    python3 fitbit-sync.py sync --days 30 # Backfill last 30 days (skips stored days)
+    python3 fitbit-sync.py sync --days 30 --force  # Refetch stored days too
+    python3 fitbit-sync.py quantize-model # Optional: build INT8 model.int8.onnx (needs onnx)
 """
 
 import argparse
 import base64
+import functools
 import hashlib
 import json
 import os
 import secrets
 import sqlite3
-import struct
 import sys
+import threading
+import time
 import webbrowser
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as _date, datetime, timedelta, timezone
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
 from urllib.parse import urlencode, urlparse, parse_qs
 
 import requests
+from requests.adapters import HTTPAdapter
 import numpy as np
 import onnxruntime as ort
 from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
 
+# orjson decodes the larger activity payloads several times faster; optional
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
 from cycle import build_cycle_summary, ensure_table as ensure_cycle_table
 
 
@@ -41,12 +53,41 @@ RECALL_DIR = Path.home() / ".recall"
 CONFIG_PATH = RECALL_DIR / "fitbit.json"
 DB_PATH = RECALL_DIR / "recall.db"
 MODEL_DIR = RECALL_DIR / "models" / "all-MiniLM-L6-v2"
+INT8_MODEL_NAME = "model.int8.onnx"
 
 FITBIT_AUTH_URL = "https://www.fitbit.com/oauth2/authorize"
 FITBIT_TOKEN_URL = "https://api.fitbit.com/oauth2/token"
 FITBIT_API_BASE = "https://api.fitbit.com"
 SCOPES = "sleep heartrate activity oxygen_saturation"
 REDIRECT_URI = "http://127.0.0.1:8189/callback"
+HTTP_TIMEOUT = 15
+
+SLEEP_URL = FITBIT_API_BASE + "/1.2/user/-/sleep/date/{}.json"
+HEART_URL = FITBIT_API_BASE + "/1/user/-/activities/heart/date/{}/1d.json"
+ACTIVITY_URL = FITBIT_API_BASE + "/1/user/-/activities/date/{}.json"
+SPO2_URL = FITBIT_API_BASE + "/1/user/-/spo2/date/{}.json"
+
+
+# ── HTTP ───────────────────────────────────────────────────────
+
+# One keep-alive session for every Fitbit request, so a sync pays the
+# TCP+TLS handshake to api.fitbit.com once instead of per call
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "recall-fitbit-sync"})
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8))
+
+# Set once a 429 survives its retry, so in-flight and remaining requests stop early
+RATE_LIMITED = threading.Event()
+MAX_RETRY_WAIT = 60  # seconds
+LOW_QUOTA = 4  # requests left in the hourly window before api_get starts pacing
+
+# Today and yesterday are always refetched: Fitbit keeps filling them in as
+# the tracker uploads, and fitbit-cron.sh relies on that with --days 2
+REFRESH_DAYS = 2
+
+
+class FetchError(Exception):
+    """A Fitbit request failed, as opposed to returning no data for the day."""
 
 
 # ── Config ─────────────────────────────────────────────────────
@@ -144,20 +185,20 @@ def do_auth(config: dict):
     print("Got authorization code, exchanging for token...")
 
     # Exchange code for token
-    resp = requests.post(FITBIT_TOKEN_URL, data={
+    resp = SESSION.post(FITBIT_TOKEN_URL, data={
         "grant_type": "authorization_code",
         "client_id": client_id,
         "code": code,
         "redirect_uri": config.get("redirect_uri", REDIRECT_URI),
         "code_verifier": verifier,
-    }, headers={"Content-Type": "application/x-www-form-urlencoded"})
+    }, headers={"Content-Type": "application/x-www-form-urlencoded"}, timeout=HTTP_TIMEOUT)
 
     if resp.status_code != 200:
         print(f"Token exchange failed ({resp.status_code}): {resp.text}")
         sys.exit(1)
 
-    token_data = resp.json()
-    token_data["expires_at"] = datetime.now().timestamp() + token_data.get("expires_in", 28800)
+    token_data = _loads(resp.content)
+    token_data["expires_at"] = time.time() + token_data.get("expires_in", 28800)
 
     config["token"] = token_data
     save_config(config)
@@ -166,29 +207,29 @@ def do_auth(config: dict):
 
 # ── Token Management ───────────────────────────────────────────
 
-def ensure_token(config: dict) -> str:
-    """Return a valid access token, refreshing if needed."""
+def ensure_token(config: dict, margin: int = 60) -> str:
+    """Return a valid access token, refreshing if it expires within margin seconds."""
     token = config.get("token")
     if not token:
         print("No token found. Run: fitbit-sync.py auth")
         sys.exit(1)
 
-    # Refresh if expired (with 60s buffer)
-    if datetime.now().timestamp() >= token.get("expires_at", 0) - 60:
+    # Refresh if expired (with a buffer)
+    if time.time() >= token.get("expires_at", 0) - margin:
         print("Token expired, refreshing...")
-        resp = requests.post(FITBIT_TOKEN_URL, data={
+        resp = SESSION.post(FITBIT_TOKEN_URL, data={
             "grant_type": "refresh_token",
             "client_id": config["client_id"],
             "refresh_token": token["refresh_token"],
-        }, headers={"Content-Type": "application/x-www-form-urlencoded"})
+        }, headers={"Content-Type": "application/x-www-form-urlencoded"}, timeout=HTTP_TIMEOUT)
 
         if resp.status_code != 200:
             print(f"Token refresh failed ({resp.status_code}): {resp.text}")
             print("Try re-authorizing: fitbit-sync.py auth")
             sys.exit(1)
 
-        token_data = resp.json()
-        token_data["expires_at"] = datetime.now().timestamp() + token_data.get("expires_in", 28800)
+        token_data = _loads(resp.content)
+        token_data["expires_at"] = time.time() + token_data.get("expires_in", 28800)
         config["token"] = token_data
         save_config(config)
         print("Token refreshed.")
@@ -196,33 +237,87 @@ def ensure_token(config: dict) -> str:
     return config["token"]["access_token"]
 
 
-def api_get(config: dict, path: str) -> dict | None:
-    """Make an authenticated GET request to Fitbit API."""
-    token = ensure_token(config)
-    resp = requests.get(
-        f"{FITBIT_API_BASE}{path}",
-        headers={"Authorization": f"Bearer {token}"},
-    )
-    if resp.status_code == 200:
-        return resp.json()
-    if resp.status_code == 429:
+# ensure_token result for the current sync, re-checked at most every
+# TOKEN_RECHECK seconds (sooner if the token expires first). Only called
+# between days, from the main thread, so workers never see the session's
+# Authorization header change under them.
+TOKEN_RECHECK = 600
+# Token lifetime a day's fetch may need, including one 429 retry wait
+TOKEN_MARGIN = 60 + MAX_RETRY_WAIT + 2 * HTTP_TIMEOUT
+_token_cache = {"value": None, "valid_until": 0.0}
+
+
+def cached_token(config: dict) -> str:
+    """ensure_token without re-reading the token on every request.
+
+    Also keeps the session's Authorization header in step with the token.
+    Not locked: call only from the main thread, while no requests are in
+    flight on SESSION.
+    """
+    now = time.monotonic()
+    if _token_cache["value"] is None or now >= _token_cache["valid_until"]:
+        # Keep a stale bearer off the token refresh request
+        SESSION.headers.pop("Authorization", None)
+        _token_cache["value"] = ensure_token(config, TOKEN_MARGIN)
+        SESSION.headers["Authorization"] = f"Bearer {_token_cache['value']}"
+        expires_in = config["token"].get("expires_at", 0) - TOKEN_MARGIN - time.time()
+        _token_cache["valid_until"] = now + min(TOKEN_RECHECK, expires_in)
+    return _token_cache["value"]
+
+
+def retry_after(resp: requests.Response) -> int:
+    """Seconds to wait after a 429, from Retry-After or Fitbit's reset header."""
+    for header in ("Retry-After", "fitbit-rate-limit-reset"):
+        value = resp.headers.get(header)
+        if value and value.isdigit():
+            return int(value)
+    return 1
+
+
+def api_get(url: str) -> dict | None:
+    """Make an authenticated GET request to Fitbit API.
+
+    Uses the Authorization header cached_token installs on SESSION, so the
+    caller must have called cached_token first. Returns None when there is
+    no data (404) or the rate limit was hit; raises FetchError for other
+    failed requests.
+    """
+    if RATE_LIMITED.is_set():
+        return None
+    path = url.removeprefix(FITBIT_API_BASE)
+    for attempt in range(2):
+        resp = SESSION.get(url, timeout=HTTP_TIMEOUT)
+        if resp.status_code != 429:
+            break
+        if attempt == 0:
+            wait = min(retry_after(resp), MAX_RETRY_WAIT)
+            print(f"  Rate limited on {path}, retrying in {wait}s")
+            time.sleep(wait)
+    else:
+        RATE_LIMITED.set()
         print(f"  Rate limited on {path}, skipping")
         return None
+
+    # Slow down before the hourly quota runs out mid-backfill
+    remaining = resp.headers.get("fitbit-rate-limit-remaining")
+    if remaining is not None and remaining.isdigit() and int(remaining) < LOW_QUOTA:
+        time.sleep(2)
+
+    if resp.status_code == 200:
+        return _loads(resp.content)
     if resp.status_code in (401, 403):
-        print(f"  Auth error on {path} ({resp.status_code}), try re-authorizing")
-        return None
+        raise FetchError(f"Auth error on {path} ({resp.status_code}), try re-authorizing")
     # Some endpoints return empty for days without data
     if resp.status_code == 404:
         return None
-    print(f"  API error {resp.status_code} on {path}: {resp.text[:200]}")
-    return None
+    raise FetchError(f"API error {resp.status_code} on {path}: {resp.text[:200]}")
 
 
 # ── Data Fetching ──────────────────────────────────────────────
 
-def fetch_sleep(config: dict, date: str) -> dict | None:
+def fetch_sleep(date: str) -> dict | None:
     """Fetch sleep data for a date (YYYY-MM-DD)."""
-    data = api_get(config, f"/1.2/user/-/sleep/date/{date}.json")
+    data = api_get(SLEEP_URL.format(date))
     if not data or not data.get("sleep"):
         return None
 
@@ -271,9 +366,9 @@ def fetch_sleep(config: dict, date: str) -> dict | None:
     return result
 
 
-def fetch_heart_rate(config: dict, date: str) -> dict | None:
+def fetch_heart_rate(date: str) -> dict | None:
     """Fetch heart rate data for a date."""
-    data = api_get(config, f"/1/user/-/activities/heart/date/{date}/1d.json")
+    data = api_get(HEART_URL.format(date))
     if not data:
         return None
 
@@ -297,9 +392,9 @@ def fetch_heart_rate(config: dict, date: str) -> dict | None:
     return result if result else None
 
 
-def fetch_activity(config: dict, date: str) -> dict | None:
+def fetch_activity(date: str) -> dict | None:
     """Fetch activity summary for a date."""
-    data = api_get(config, f"/1/user/-/activities/date/{date}.json")
+    data = api_get(ACTIVITY_URL.format(date))
     if not data or "summary" not in data:
         return None
 
@@ -319,9 +414,9 @@ def fetch_activity(config: dict, date: str) -> dict | None:
     }
 
 
-def fetch_spo2(config: dict, date: str) -> dict | None:
+def fetch_spo2(date: str) -> dict | None:
     """Fetch SpO2 data for a date."""
-    data = api_get(config, f"/1/user/-/spo2/date/{date}.json")
+    data = api_get(SPO2_URL.format(date))
     if not data:
         return None
 
@@ -331,12 +426,14 @@ def fetch_spo2(config: dict, date: str) -> dict | None:
         # Try minutes array format
         minutes = data.get("minutes", [])
         if minutes:
-            values = [m["value"] for m in minutes if "value" in m]
-            if values:
+            values = np.fromiter(
+                (m["value"] for m in minutes if "value" in m), dtype=np.float64,
+            )
+            if values.size:
                 return {
-                    "avg": round(sum(values) / len(values), 1),
-                    "min": min(values),
-                    "max": max(values),
+                    "avg": round(float(values.mean()), 1),
+                    "min": float(values.min()),
+                    "max": float(values.max()),
                 }
         return None
 
@@ -347,6 +444,15 @@ def fetch_spo2(config: dict, date: str) -> dict | None:
     }
 
 
+# The four per-day endpoints are independent, so sync_day fetches them in parallel
+FETCHERS = {
+    "sleep": fetch_sleep,
+    "heart": fetch_heart_rate,
+    "activity": fetch_activity,
+    "spo2": fetch_spo2,
+}
+
+
 # ── Summary Generation ─────────────────────────────────────────
 
 def format_duration(minutes: int) -> str:
@@ -394,7 +500,7 @@ def build_summary(
     cycle_summary: str | None = None,
 ) -> str:
     """Build structured health summary for a given day."""
-    dt = datetime.strptime(date, "%Y-%m-%d")
+    dt = _date.fromisoformat(date)
     day_name = dt.strftime("%A")
     header = f"Health data for {day_name}, {dt.strftime('%B %d, %Y').replace(' 0', ' ')}:"
     lines = [header]
@@ -518,8 +624,16 @@ class EmbeddingService:
 
     Uses all-MiniLM-L6-v2 (384 dimensions). Serialization format is
     binary float32 array, compatible with C# Buffer.BlockCopy.
+
+    Input and output tensors live in buffers allocated once per instance
+    and bound with ORT IOBinding, so an instance must not be shared
+    between threads.
     """
 
+    DIM = 384
+    MAX_TOKENS = 256
+    MAX_BATCH = 64
+
     def __init__(self, model_dir: Path = MODEL_DIR):
         model_path = model_dir / "model.onnx"
         vocab_path = model_dir / "vocab.txt"
@@ -527,11 +641,32 @@ class EmbeddingService:
         if not model_path.exists() or not vocab_path.exists():
             raise FileNotFoundError(f"Model files not found in {model_dir}")
 
+        # Prefer the INT8 model from `quantize-model` when it has been built
+        int8_path = model_dir / INT8_MODEL_NAME
+        if int8_path.exists():
+            model_path = int8_path
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = min(4, os.cpu_count() or 1)
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+
+        self.model_path = model_path
         self.session = ort.InferenceSession(
             str(model_path),
+            sess_options=options,
             providers=["CPUExecutionProvider"],
         )
         self.tokenizer = self._build_tokenizer(vocab_path)
+        self._output_name = self.session.get_outputs()[0].name
+
+        # Flat buffers: the first n * seq_len elements are viewed as a
+        # contiguous (n, seq_len) batch, whatever seq_len padding produced
+        size = self.MAX_BATCH * self.MAX_TOKENS
+        self._ids = np.zeros(size, dtype=np.int64)
+        self._mask = np.zeros(size, dtype=np.int64)
+        self._token_types = np.zeros(size, dtype=np.int64)  # always zero
+        self._hidden = np.empty(size * self.DIM, dtype=np.float32)
 
     @staticmethod
     def _build_tokenizer(vocab_path: Path) -> Tokenizer:
@@ -543,36 +678,91 @@ class EmbeddingService:
             pair="[CLS] $A [SEP] $B:1 [SEP]:1",
             special_tokens=[("[CLS]", 101), ("[SEP]", 102)],
         )
-        tokenizer.enable_truncation(max_length=256)
-        tokenizer.enable_padding(length=256)
+        tokenizer.enable_truncation(max_length=EmbeddingService.MAX_TOKENS)
+        # Pad to the longest input in each batch, not a fixed 256: daily
+        # summaries are ~150 tokens and padding is wasted transformer work
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]", pad_to_multiple_of=8)
         return tokenizer
 
     def embed(self, text: str) -> np.ndarray:
-        encoded = self.tokenizer.encode(text)
-        input_ids = np.array([encoded.ids], dtype=np.int64)
-        attention_mask = np.array([encoded.attention_mask], dtype=np.int64)
-        token_type_ids = np.zeros_like(input_ids)
-
-        outputs = self.session.run(None, {
-            "input_ids": input_ids,
-            "attention_mask": attention_mask,
-            "token_type_ids": token_type_ids,
-        })
-
-        token_embeddings = outputs[0]  # (1, seq_len, 384)
-        mask = attention_mask[:, :, np.newaxis].astype(np.float32)
-        summed = (token_embeddings * mask).sum(axis=1)
-        counts = mask.sum(axis=1).clip(min=1e-9)
-        pooled = summed / counts
+        return self.embed_batch([text])[0]  # (384,)
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        """Embed several texts, one ONNX run per MAX_BATCH; returns (N, 384)."""
+        if len(texts) <= self.MAX_BATCH:
+            return self._embed_chunk(texts)
+        return np.concatenate([
+            self._embed_chunk(texts[i:i + self.MAX_BATCH])
+            for i in range(0, len(texts), self.MAX_BATCH)
+        ])
+
+    def _embed_chunk(self, texts: list[str]) -> np.ndarray:
+        encoded = self.tokenizer.encode_batch(texts)
+        n, seq_len = len(encoded), len(encoded[0].ids)
+        shape = (n, seq_len)
+
+        input_ids = self._ids[:n * seq_len].reshape(shape)
+        attention_mask = self._mask[:n * seq_len].reshape(shape)
+        token_type_ids = self._token_types[:n * seq_len].reshape(shape)
+        input_ids[:] = [e.ids for e in encoded]
+        attention_mask[:] = [e.attention_mask for e in encoded]
+        token_embeddings = self._hidden[:n * seq_len * self.DIM].reshape(n, seq_len, self.DIM)
+
+        # ORT reads the inputs from and writes the output into our buffers
+        binding = self.session.io_binding()
+        binding.bind_cpu_input("input_ids", input_ids)
+        binding.bind_cpu_input("attention_mask", attention_mask)
+        binding.bind_cpu_input("token_type_ids", token_type_ids)
+        binding.bind_output(
+            self._output_name, "cpu", 0, np.float32,
+            token_embeddings.shape, token_embeddings.ctypes.data,
+        )
+        self.session.run_with_iobinding(binding)
 
-        norm = np.linalg.norm(pooled, axis=1, keepdims=True).clip(min=1e-9)
-        normalized = pooled / norm
+        return self._pool(token_embeddings, attention_mask)
 
-        return normalized[0]  # (384,)
+    @staticmethod
+    def _pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Masked mean pooling followed by L2 normalization, (N, 384).
+
+        einsum reads the token embeddings once to produce the pooled sums;
+        the divisions then happen in place on that small (N, 384) array.
+        """
+        mask = attention_mask.astype(np.float32)
+        pooled = np.einsum("bsd,bs->bd", token_embeddings, mask)
+        pooled /= np.maximum(mask.sum(axis=1, keepdims=True), 1e-9)
+        norms = np.sqrt(np.einsum("bd,bd->b", pooled, pooled))
+        pooled /= np.maximum(norms, 1e-9)[:, np.newaxis]
+        return pooled
 
     @staticmethod
     def serialize(embedding: np.ndarray) -> bytes:
-        return struct.pack(f"{len(embedding)}f", *embedding)
+        # Little-endian float32, the layout C# Buffer.BlockCopy reads back
+        return np.ascontiguousarray(embedding, dtype="<f4").tobytes()
+
+
+def quantize_model(model_dir: Path = MODEL_DIR):
+    """Write a dynamically quantized INT8 copy of model.onnx next to it.
+
+    EmbeddingService picks it up automatically. The server still embeds
+    queries with the FP32 model; INT8 vectors stay close in cosine terms
+    but are not bit-identical, so delete the file to go back to FP32.
+    """
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as e:
+        print(f"Error: quantize-model needs the onnx package ({e})")
+        print("Install it with: pip install onnx")
+        sys.exit(1)
+
+    source = model_dir / "model.onnx"
+    target = model_dir / INT8_MODEL_NAME
+    if not source.exists():
+        print(f"Error: {source} not found")
+        sys.exit(1)
+
+    quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+    print(f"Wrote {target} ({source.stat().st_size // 1024} KiB -> {target.stat().st_size // 1024} KiB)")
 
 
 # ── Database ───────────────────────────────────────────────────
@@ -595,11 +785,17 @@ def ensure_table(conn: sqlite3.Connection):
     conn.execute("""
         CREATE INDEX IF NOT EXISTS idx_health_date ON health_data(date DESC)
     """)
-    conn.commit()
+    # Fingerprint of the text behind each embedding (see summary_hash)
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(health_data)")}
+    if "summary_hash" not in columns:
+        conn.execute("ALTER TABLE health_data ADD COLUMN summary_hash TEXT")
 
 
-def write_health_entry(
-    conn: sqlite3.Connection,
+# Compact JSON for the *_json columns: no whitespace after separators
+_dumps = functools.partial(json.dumps, separators=(",", ":"))
+
+
+def health_row(
     date: str,
     summary: str,
     sleep: dict | None,
@@ -607,88 +803,201 @@ def write_health_entry(
     activity: dict | None,
     spo2: dict | None,
     embedding: bytes | None,
-):
-    """Insert or replace health data for a date."""
-    conn.execute("""
-        INSERT OR REPLACE INTO health_data
-            (date, summary, sleep_json, heart_json, activity_json, spo2_json, embedding, synced_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+    embedding_hash: str | None,
+    synced_at: str,
+) -> tuple:
+    """Build the health_data parameter tuple for one day."""
+    return (
         date,
         summary,
-        json.dumps(sleep) if sleep else None,
-        json.dumps(heart) if heart else None,
-        json.dumps(activity) if activity else None,
-        json.dumps(spo2) if spo2 else None,
+        _dumps(sleep) if sleep else None,
+        _dumps(heart) if heart else None,
+        _dumps(activity) if activity else None,
+        _dumps(spo2) if spo2 else None,
         embedding,
-        datetime.now(tz=__import__('datetime').timezone.utc).isoformat(),
-    ))
-    conn.commit()
+        embedding_hash if embedding else None,
+        synced_at,
+    )
+
+
+def write_health_entries(conn: sqlite3.Connection, rows: list[tuple]):
+    """Insert or replace health data rows from health_row(). The caller commits."""
+    conn.executemany("""
+        INSERT OR REPLACE INTO health_data
+            (date, summary, sleep_json, heart_json, activity_json, spo2_json,
+             embedding, summary_hash, synced_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
 
 
 # ── Sync ───────────────────────────────────────────────────────
 
-def sync_day(config: dict, conn: sqlite3.Connection, embedder: EmbeddingService | None, date: str):
-    """Fetch and store health data for a single day."""
+def fetch_day(
+    config: dict,
+    conn: sqlite3.Connection,
+    date: str,
+    pool: ThreadPoolExecutor,
+) -> tuple | None:
+    """Fetch health data for a single day and build its summary.
+
+    Returns (date, summary, sleep, heart, activity, spo2), or None if
+    Fitbit had nothing for the day, a request failed, or the rate limit
+    cut the fetch short.
+    """
     print(f"  Syncing {date}...", end=" ", flush=True)
 
-    sleep = fetch_sleep(config, date)
-    heart = fetch_heart_rate(config, date)
-    activity = fetch_activity(config, date)
-    spo2 = fetch_spo2(config, date)
+    # Refresh the token and session header here, while the pool is idle
+    cached_token(config)
+    futures = {name: pool.submit(fetch, date) for name, fetch in FETCHERS.items()}
+    # A failed or skipped endpoint leaves the day incomplete; writing it
+    # now would make later syncs treat it as done
+    try:
+        data = {name: future.result() for name, future in futures.items()}
+    except FetchError as e:
+        print(f"{e}, not saved")
+        return None
+    sleep, heart, activity, spo2 = data["sleep"], data["heart"], data["activity"], data["spo2"]
+
+    if RATE_LIMITED.is_set():
+        print("rate limited, not saved")
+        return None
 
     if not any([sleep, heart, activity, spo2]):
         print("no data")
-        return
+        return None
 
     baseline_hr = config.get("resting_hr_baseline", 67)
 
     # Add cycle context if available
     cycle_summary = None
     try:
-        from datetime import date as date_type
-        cycle_summary = build_cycle_summary(conn, date_type.fromisoformat(date))
+        cycle_summary = build_cycle_summary(conn, _date.fromisoformat(date))
     except Exception:
         pass  # cycle data not imported yet, or table missing — silently skip
 
     summary = build_summary(date, sleep, heart, activity, spo2, baseline_hr, cycle_summary)
+    print("ok")
+    return date, summary, sleep, heart, activity, spo2
 
-    embedding = None
-    if embedder:
+
+def summary_hash(embedder: EmbeddingService, summary: str) -> str:
+    """Fingerprint of an embedding's input: the model file and the summary text."""
+    h = hashlib.sha256(embedder.model_path.name.encode())
+    h.update(b"\0")
+    h.update(summary.encode())
+    return h.hexdigest()
+
+
+def embed_summaries(embedder: EmbeddingService, summaries: list[str]) -> list[bytes | None]:
+    """Serialized embeddings for all summaries, batched into one model run.
+
+    Falls back to embedding one at a time if the batch fails, so a single
+    bad input only loses its own embedding.
+    """
+    try:
+        return [EmbeddingService.serialize(v) for v in embedder.embed_batch(summaries)]
+    except Exception as e:
+        print(f"  Batch embedding failed ({e}), embedding one at a time")
+
+    embeddings = []
+    for summary in summaries:
         try:
-            embedding = EmbeddingService.serialize(embedder.embed(summary))
+            embeddings.append(EmbeddingService.serialize(embedder.embed(summary)))
         except Exception as e:
-            print(f"(embedding failed: {e})", end=" ")
+            print(f"  (embedding failed: {e})")
+            embeddings.append(None)
+    return embeddings
 
-    write_health_entry(conn, date, summary, sleep, heart, activity, spo2, embedding)
-    print("ok")
 
+def do_sync(config: dict, days: int, force: bool = False):
+    """Sync health data for the specified number of days.
 
-def do_sync(config: dict, days: int):
-    """Sync health data for the specified number of days."""
+    Days already in health_data are skipped unless force is set, except
+    for the last REFRESH_DAYS, whose data may still be arriving.
+    """
     # Initialize embedding service
     embedder = None
     try:
         embedder = EmbeddingService()
-        print(f"Embedding model loaded from {MODEL_DIR}")
+        print(f"Embedding model loaded from {embedder.model_path}")
     except FileNotFoundError:
         print("Warning: Embedding model not found, syncing without embeddings")
     except Exception as e:
         print(f"Warning: Could not load embedding model: {e}")
 
     conn = sqlite3.connect(str(DB_PATH))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
     ensure_table(conn)
     ensure_cycle_table(conn)
 
     today = datetime.now().date()
     print(f"Syncing {days} day(s) of Fitbit data...")
 
-    for i in range(days):
-        date = (today - timedelta(days=i)).isoformat()
-        try:
-            sync_day(config, conn, embedder, date)
-        except Exception as e:
-            print(f"  Error syncing {date}: {e}")
+    existing = set()
+    if not force:
+        oldest = (today - timedelta(days=days - 1)).isoformat()
+        refresh_from = (today - timedelta(days=REFRESH_DAYS - 1)).isoformat()
+        existing = {
+            r[0] for r in conn.execute(
+                "SELECT date FROM health_data WHERE date >= ? AND date < ?",
+                (oldest, refresh_from),
+            )
+        }
+        if existing:
+            print(f"Skipping {len(existing)} day(s) already synced (use --force to refetch)")
+
+    fetched = []
+    with ThreadPoolExecutor(max_workers=len(FETCHERS)) as pool:
+        for i in range(days):
+            if RATE_LIMITED.is_set():
+                print("Fitbit rate limit reached, stopping early.")
+                break
+            date = (today - timedelta(days=i)).isoformat()
+            if date in existing:
+                continue
+            try:
+                day = fetch_day(config, conn, date, pool)
+            except Exception as e:
+                print(f"  Error syncing {date}: {e}")
+                continue
+            if day:
+                fetched.append(day)
+
+    embeddings = [None] * len(fetched)
+    hashes = [None] * len(fetched)
+    if embedder and fetched:
+        # Keep the stored embedding for days whose summary hasn't changed
+        hashes = [summary_hash(embedder, day[1]) for day in fetched]
+        stored = {
+            date: (h, embedding) for date, h, embedding in conn.execute(
+                "SELECT date, summary_hash, embedding FROM health_data WHERE date >= ?",
+                (min(day[0] for day in fetched),),
+            )
+        }
+        for i, day in enumerate(fetched):
+            h, embedding = stored.get(day[0], (None, None))
+            if embedding is not None and h == hashes[i]:
+                embeddings[i] = embedding
+
+        todo = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if todo:
+            fresh = embed_summaries(embedder, [fetched[i][1] for i in todo])
+            for i, embedding in zip(todo, fresh):
+                embeddings[i] = embedding
+        if len(todo) < len(fetched):
+            print(f"Reused {len(fetched) - len(todo)} unchanged embedding(s)")
+
+    synced_at = datetime.now(timezone.utc).isoformat()
+    rows = [
+        health_row(*day, embedding, h, synced_at)
+        for day, embedding, h in zip(fetched, embeddings, hashes)
+    ]
+
+    # One prepared statement, one transaction (and one fsync) for the whole sync
+    with conn:
+        write_health_entries(conn, rows)
 
     conn.close()
     print("Done.")
@@ -707,6 +1016,12 @@ def main():
         "--days", type=int, default=2,
         help="Number of days to sync (default: 2 = today + yesterday)",
     )
+    sync_parser.add_argument(
+        "--force", action="store_true",
+        help="Refetch days that are already stored",
+    )
+
+    sub.add_parser("quantize-model", help="Build an INT8 copy of the embedding model")
 
     args = parser.parse_args()
 
@@ -714,12 +1029,16 @@ def main():
         parser.print_help()
         sys.exit(1)
 
+    if args.command == "quantize-model":
+        quantize_model()
+        return
+
     config = load_config()
 
     if args.command == "auth":
         do_auth(config)
     elif args.command == "sync":
-        do_sync(config, args.days)
+        do_sync(config, args.days, args.force)
 
 
 if __name__ == "__main__":